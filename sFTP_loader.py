@@ -12,16 +12,49 @@ directories/listing files.*
 
 import os
 import sys
+import asyncio
+import atexit
+import functools
 import stat
 import time
 import csv
-from contextlib import contextmanager
-from typing import List, Union, Tuple
+import io
+import heapq
+import operator
+import queue
+import shlex
+import socket
+import threading
+import warnings
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager, ExitStack
+from typing import Dict, Iterable, Iterator, List, Optional, Union, Tuple
 from pathlib import Path as path
 from pathlib import PurePosixPath as posix_path
+
+# Paramiko's crypto backend warns about deprecated ciphers at import time; 
+# the filter has to be in place before paramiko is imported
+try:
+    from cryptography.utils import CryptographyDeprecationWarning
+    warnings.filterwarnings("ignore", category=CryptographyDeprecationWarning)
+except ImportError:
+    pass
 import paramiko as pm
 import logging 
 
+try:
+    # Not available on Windows; prompts simply go without history there
+    import readline
+except ImportError:
+    readline = None
+
+try:
+    # Optional: only needed for SFTP_BACKEND=asyncssh
+    import asyncssh
+except ImportError:
+    asyncssh = None
+
 ## Log setup
 log_dir = path('logs')
 log_dir.mkdir(parents = True, exist_ok = True)
@@ -32,40 +65,289 @@ logging.basicConfig(
                     )
 log = logging.getLogger(__name__)
 
+# Paramiko logs every packet at DEBUG; keep it to warnings even when 
+# LOG_LEVEL=DEBUG so handshakes don't flood stderr
+logging.getLogger("paramiko").setLevel(logging.WARNING)
+
+# sFTP write size per request; 32 KiB is the largest chunk every server accepts
+UPLOAD_BLOCK_SIZE = 1 << 15
+
+# Uploads go through paramiko unless SFTP_BACKEND=asyncssh, which keeps 
+# up to ASYNC_MAX_REQUESTS blocks of ASYNC_BLOCK_SIZE in flight per file
+SFTP_BACKEND = os.getenv("SFTP_BACKEND", "paramiko").lower()
+ASYNC_BLOCK_SIZE = 16384
+ASYNC_MAX_REQUESTS = 128
+
+# Read buffer for local files being uploaded
+LOCAL_READ_BUFFER_SIZE = 1 << 20
+
+# Buffer for remote file handles opened via open_remote()
+REMOTE_BUFFER_SIZE = 1 << 15
+
+# Transport tuning: SSH keepalive interval and the largest channel window 
+# allowed, so big uploads aren't throttled waiting for window adjustments
+SSH_KEEPALIVE_SECONDS = 30
+SSH_WINDOW_SIZE = 2147483647
+SSH_MAX_PACKET_SIZE = 32768
+
+# Longest a remote `mkdir -p`/`rm -rf` may take before falling back to sFTP
+EXEC_TIMEOUT_SECONDS = 30
+
+# Directories listed in parallel for 'tree', one sFTP channel each
+TREE_WORKERS = 8
+
+# Column width for file names in the 'list' view
+LIST_NAME_WIDTH = 60
+
+# Write buffer for CSV exports
+CSV_BUFFER_SIZE = 1 << 20
+
+# Prompt history kept between runs when readline is available
+HISTORY_FILE = path("~/.sftp_loader_history").expanduser()
+HISTORY_LENGTH = 1000
+
+# Remote listings already fetched this session, keyed by directory path
+_dir_cache: Dict[str, List[pm.SFTPAttributes]] = {}
+
+
+def setup_history() -> None:
+    """
+    Loads previous answers into readline so hosts and paths can be 
+    recalled with the arrow keys, and saves them again on exit.
+    """
+    if readline is None:
+        return
+    readline.set_history_length(HISTORY_LENGTH)
+    try:
+        readline.read_history_file(HISTORY_FILE)
+    except OSError:
+        pass
+
+    def _save() -> None:
+        try:
+            readline.write_history_file(HISTORY_FILE)
+        except OSError as e:
+            log.warning(f"Couldn't save prompt history: {e}")
+    atexit.register(_save)
+
+@functools.lru_cache(maxsize=128)
+def _norm(answer: str) -> str:
+    """
+    Normalises a menu answer for comparison.
+    """
+    return answer.strip().lower()
 
-def ask(prompt: str) -> str:
+def ask(prompt: str, remember: bool = True) -> str:
     """
     Prompts the user through inputs, and if they 
     type "exit", this function will terminate the loop.
+
+    Pass remember=False to keep the answer out of the prompt history.
     """
-    response = input(prompt).strip()
+    track = not remember and readline is not None
+    before = readline.get_current_history_length() if track else 0
+    raw = input(prompt)
+    response = raw.strip()
+    if track:
+        # input() only records a line on a TTY, and skips repeats of the 
+        # previous entry, so only drop an item this call actually added
+        after = readline.get_current_history_length()
+        if after > before and readline.get_history_item(after) == raw:
+            readline.remove_history_item(after - 1)
     if response.lower() == "exit":
         log.info("Goodbye!")
         sys.exit(0)
     return response
 
+def ask_credentials() -> Tuple[str, str, Optional[str], Optional[str]]:
+    """
+    Prompts for host and user, then either a password or, when that is 
+    left blank, a private key file (blank again means use ssh-agent).
+    """
+    host = ask("Host: ").strip()
+    username = ask("Username: ")
+    password = ask("Password (blank for key auth): ", remember=False) or None
+    pkey_path = None
+    if password is None:
+        pkey_path = ask("Private key file (blank for ssh-agent): ") or None
+    return host, username, password, pkey_path
+
+def ask_paths(prompt: str) -> List[posix_path]:
+    """
+    Prompts for one remote path, or for a comma-separated list of them 
+    when the user asks for several (names with commas need the former).
+    """
+    if _norm(ask("Several paths at once? (yes/no): ")) == "yes":
+        return [posix_path(p.strip()) for p in
+                ask(f"{prompt.rstrip(': ')} (comma-separated): ").split(",")
+                if p.strip()]
+    return [posix_path(ask(prompt).strip())]
+
+def _load_pkey(pkey_path: str) -> pm.PKey:
+    """
+    Loads a private key file, trying each key type paramiko supports.
+    """
+    key_path = str(path(pkey_path).expanduser())
+    for key_class in (pm.Ed25519Key, pm.ECDSAKey, pm.RSAKey):
+        try:
+            return key_class.from_private_key_file(key_path)
+        except pm.PasswordRequiredException:
+            log.error(f"Private key is passphrase protected: {key_path}")
+            raise
+        except pm.SSHException:
+            continue
+    raise pm.SSHException(f"Unsupported or invalid private key: {key_path}")
+
+def _agent_auth(transport: pm.Transport, username: str) -> None:
+    """
+    Authenticates with the first key held by ssh-agent that the server accepts.
+    """
+    transport.start_client()
+    agent = pm.Agent()
+    try:
+        for key in agent.get_keys():
+            try:
+                transport.auth_publickey(username, key)
+                return
+            except pm.AuthenticationException:
+                continue
+        raise pm.AuthenticationException("No ssh-agent key was accepted")
+    finally:
+        # Drops the agent socket once authentication is done
+        agent.close()
+
 @contextmanager
 def sftp_connection(host: str, port: int,
-                    username: str, password: str):
-    transport = pm.Transport((host, port))
-    transport.connect(username=username, password=password)
+                    username: str, password: Optional[str] = None,
+                    pkey_path: Optional[str] = None):
+    """
+    Opens an sFTP session, authenticating with pkey_path if given, 
+    else password, else whatever keys ssh-agent holds. Key auth spares 
+    the server a password KDF on every handshake.
+    """
+    transport = pm.Transport((host, port),
+                             default_window_size=SSH_WINDOW_SIZE,
+                             default_max_packet_size=SSH_MAX_PACKET_SIZE)
+    if pkey_path:
+        transport.connect(username=username, pkey=_load_pkey(pkey_path))
+    elif password:
+        transport.connect(username=username, password=password)
+    else:
+        _agent_auth(transport, username)
+    # Keeps the session alive while the user sits at a prompt
+    transport.set_keepalive(SSH_KEEPALIVE_SECONDS)
     sftp = pm.SFTPClient.from_transport(transport)
     try:
         yield sftp
     finally:
         sftp.close()
         transport.close()
+
+@contextmanager
+def sftp_pool(host: str, port: int,
+              username: str, password: Optional[str], size: int,
+              pkey_path: Optional[str] = None):
+    """
+    Opens `size` independent sFTP sessions and yields them as a queue of 
+    idle clients. Paramiko channels aren't thread-safe, so a worker thread 
+    must get() a client, use it alone, then put() it back.
+    """
+    idle: "queue.Queue[pm.SFTPClient]" = queue.Queue()
+    with ExitStack() as stack:
+        for _ in range(size):
+            idle.put(stack.enter_context(
+                sftp_connection(host, port, username, password, pkey_path)))
+        yield idle
     
 
-def upload_file(local_path: path, 
-                remote_dir: posix_path, 
-                hostname: str, 
-                port: int,
-                username: str, 
-                password: str
+def _cache_key(remote_dir: Union[str, posix_path]) -> str:
+    """
+    Normalises a remote path so every spelling of a directory 
+    ('./sub', 'sub/', 'sub') shares one cache entry.
+    """
+    return str(posix_path(remote_dir))
+
+def _child_prefix(key: str) -> str:
+    """
+    Returns the string to prepend to a name to get the cache key of 
+    that entry inside the directory `key`.
+    """
+    if key == ".":
+        return ""
+    return key if key.endswith("/") else key + "/"
+
+@contextmanager
+def open_remote(sftp: pm.SFTPClient, remote_str: str, mode: str = "rb"):
+    """
+    Opens a remote file set up for bulk transfer: a larger buffer, 
+    pipelined writes (no wait for each ack) and, for reads, prefetching 
+    so blocks are requested ahead of the reader.
+
+    Any upload or download should open its remote end through this.
+    """
+    with sftp.open(remote_str, mode, bufsize=REMOTE_BUFFER_SIZE) as rf:
+        if "r" in mode:
+            rf.prefetch()
+        else:
+            rf.set_pipelined(True)
+        yield rf
+
+_by_name = operator.attrgetter("filename")
+
+def _ls(sftp: pm.SFTPClient, 
+        remote_dir: Union[str, posix_path],
+        sort: bool = True) -> List[pm.SFTPAttributes]:
+    """
+    Returns the listing of remote_dir, hitting the server only the 
+    first time a directory is listed.
+
+    The cached list is sorted in place on request; re-sorting an 
+    already sorted list is a single linear pass.
+    """
+    key = _cache_key(remote_dir)
+    entries = _dir_cache.get(key)
+    if entries is None:
+        entries = sftp.listdir_attr(key)
+        _dir_cache[key] = entries
+    if sort:
+        entries.sort(key=_by_name)
+    return entries
+
+def _invalidate(remote_dir: Union[str, posix_path]) -> None:
+    """
+    Drops the cached listing of remote_dir after it has been modified.
+    """
+    _dir_cache.pop(_cache_key(remote_dir), None)
+
+def _invalidate_parents(remote_dir: posix_path) -> None:
+    """
+    Drops the cached listing of every ancestor of remote_dir, for 
+    changes like `mkdir -p` that may have created intermediate folders.
+    """
+    for parent in remote_dir.parents:
+        _invalidate(parent)
+
+def _invalidate_tree(remote_dir: Union[str, posix_path]) -> None:
+    """
+    Drops the cached listings of remote_dir and every folder below it.
+    """
+    key = _cache_key(remote_dir)
+    prefix = _child_prefix(key)
+    for cached in [k for k in _dir_cache if k == key or k.startswith(prefix)]:
+        del _dir_cache[cached]
+
+def upload_file(sftp: pm.SFTPClient,
+                local_path: path, 
+                remote_dir: posix_path,
+                block_size: int = UPLOAD_BLOCK_SIZE,
+                confirm: bool = False
                 ) -> None:
     """
     The function needed to upload a file directly to sFTP
+
+    Writes are pipelined (see open_remote()) so the server's acks don't 
+    gate each block; set confirm to stat the remote file afterwards and 
+    check its size.
     """
     
     # Establish file and destination paths: 
@@ -83,10 +365,25 @@ def upload_file(local_path: path,
     
     # Put file into the sFTP:
     try:
-        with sftp_connection(hostname, port, username, password) as sftp:
-            log.info(f"Uploading {local_path} → {remote_dir}")
-            sftp.put(str(local_path), str(remote_str), confirm=True)
-            log.info("Upload completed successfully.")
+        log.info(f"Uploading {local_path} → {remote_dir}")
+        local_size = local_path.stat().st_size
+        with local_path.open("rb", buffering=LOCAL_READ_BUFFER_SIZE) as lf, \
+                open_remote(sftp, remote_str, "wb") as rf:
+            # Let the kernel read ahead aggressively (Linux/BSD only)
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(lf.fileno(), 0, local_size,
+                                 os.POSIX_FADV_SEQUENTIAL)
+            while True:
+                chunk = lf.read(block_size)
+                if not chunk:
+                    break
+                rf.write(chunk)
+        if confirm:
+            remote_size = sftp.stat(remote_str).st_size
+            if remote_size != local_size:
+                raise IOError(f"Size mismatch! {remote_size} != {local_size}")
+        _invalidate(remote_dir)
+        log.info("Upload completed successfully.")
     except(pm.PasswordRequiredException, 
             pm.AuthenticationException, 
             pm.BadHostKeyException, 
@@ -94,141 +391,443 @@ def upload_file(local_path: path,
         log.error(f"An exception has occured! Error {e}")
         raise
 
-def create_dir(remote_dir: posix_path, 
-                hostname: str, 
+def upload_files(local_paths: List[path],
+                remote_dir: posix_path,
+                hostname: str,
+                port: int,
+                username: str,
+                password: Optional[str],
+                concurrency: int = 4,
+                pkey_path: Optional[str] = None
+                ) -> None:
+    """
+    Uploads many files at once over a pool of sFTP sessions.
+    """
+    concurrency = max(1, min(concurrency, len(local_paths)))
+
+    with sftp_pool(hostname, port, username, password, concurrency,
+                   pkey_path) as idle:
+        def _put(local_path: path) -> None:
+            sftp = idle.get()
+            try:
+                upload_file(sftp, local_path, remote_dir)
+            finally:
+                idle.put(sftp)
+
+        log.info(f"Uploading {len(local_paths)} files with {concurrency} connections")
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            # list() surfaces the first worker exception, if any
+            list(executor.map(_put, local_paths))
+    log.info("Batch upload completed successfully.")
+
+async def _upload_async(local_paths: List[path],
+                        remote_dir: posix_path,
+                        hostname: str,
+                        port: int,
+                        username: str,
+                        password: Optional[str],
+                        pkey_path: Optional[str]
+                        ) -> None:
+    options = {"known_hosts": None}
+    if pkey_path:
+        options["client_keys"] = [str(path(pkey_path).expanduser())]
+    async with asyncssh.connect(hostname, port=port, username=username,
+                                password=password, **options) as conn:
+        async with conn.start_sftp_client() as sftp:
+            # asyncssh would treat a missing remote_dir as the target file 
+            # name for a single upload, so insist it's an existing folder
+            if not await sftp.isdir(remote_dir.as_posix()):
+                log.error(f"Remote directory not found: {remote_dir}")
+                raise FileNotFoundError(f"{remote_dir} is not a remote directory!")
+            await sftp.put([str(p) for p in local_paths], remote_dir.as_posix(),
+                           block_size=ASYNC_BLOCK_SIZE,
+                           max_requests=ASYNC_MAX_REQUESTS)
+
+def upload_files_asyncssh(local_paths: List[path],
+                remote_dir: posix_path,
+                hostname: str,
                 port: int,
-                username: str, 
-                password: str) -> None:
+                username: str,
+                password: Optional[str],
+                pkey_path: Optional[str] = None
+                ) -> None:
+    """
+    Uploads files with asyncssh, which pipelines many requests per 
+    transfer and runs all the files over a single connection.
+
+    Requires the optional asyncssh package.
+    """
+    if asyncssh is None:
+        raise RuntimeError("SFTP_BACKEND=asyncssh but asyncssh isn't installed")
+
+    local_paths = [p.expanduser().resolve() for p in local_paths]
+    for local_path in local_paths:
+        if not local_path.is_file():
+            log.error(f"File path is not valid or isn’t a file: {local_path}")
+            raise FileNotFoundError(f"{local_path} not found or not a file")
+
+    log.info(f"Uploading {len(local_paths)} files → {remote_dir} via asyncssh")
+    asyncio.run(_upload_async(local_paths, remote_dir, hostname, port,
+                              username, password, pkey_path))
+    _invalidate(remote_dir)
+    log.info("Upload completed successfully.")
+
+def create_dir(sftp: pm.SFTPClient,
+                remote_dir: posix_path) -> None:
     """
     Creates folders in home/main directory
 
     """
     remote_str = remote_dir.as_posix()
     
-    with sftp_connection(hostname, port, username, password) as sftp:
-        try:
-            sftp.mkdir(str(remote_dir))
-            sftp.close()
-            print(f"Folder '{remote_str}' created successfully on {hostname}")
-        except Exception as e:
-            print(f"Error creating folder: {e}")
-
-def delete(remote_dir: posix_path, 
-                hostname: str, 
-                port: int,
-                username: str, 
-                password: str,
-                deletion_type: str) -> None:
+    try:
+        sftp.mkdir(str(remote_dir))
+        _invalidate(remote_dir.parent)
+        print(f"Folder '{remote_str}' created successfully.")
+    except Exception as e:
+        print(f"Error creating folder: {e}")
+
+def _exec(sftp: pm.SFTPClient, command: str) -> int:
+    """
+    Runs a shell command over a new channel on the session's transport 
+    and returns its exit status. Raises SSHException if the server 
+    refuses exec or the command doesn't finish in EXEC_TIMEOUT_SECONDS.
+
+    A zero status proves nothing on its own: with `ForceCommand 
+    internal-sftp` the server ignores the command and runs sftp-server, 
+    which exits 0 once stdin closes. Callers must check the result.
+    """
+    channel = sftp.get_channel().get_transport().open_session()
+    try:
+        channel.settimeout(EXEC_TIMEOUT_SECONDS)
+        channel.exec_command(command)
+        # Close stdin so anything waiting on it (e.g. sftp-server) exits
+        channel.shutdown_write()
+        deadline = time.monotonic() + EXEC_TIMEOUT_SECONDS
+        while channel.recv(32768):
+            pass
+        while not channel.exit_status_ready():
+            if time.monotonic() > deadline:
+                raise socket.timeout()
+            time.sleep(0.05)
+        return channel.recv_exit_status()
+    except socket.timeout:
+        raise pm.SSHException(f"Remote command timed out after {EXEC_TIMEOUT_SECONDS}s")
+    finally:
+        channel.close()
+
+def _is_dir(sftp: pm.SFTPClient, remote_str: str) -> bool:
+    try:
+        return stat.S_ISDIR(sftp.stat(remote_str).st_mode)
+    except IOError:
+        return False
+
+def create_dirs(sftp: pm.SFTPClient,
+                remote_dirs: List[posix_path]) -> None:
+    """
+    Creates several folders (and any missing parents) at once.
+
+    Runs a single `mkdir -p` on the session's transport; servers that 
+    only allow sFTP get one sftp.mkdir per folder on the same session.
+    """
+    if not remote_dirs:
+        return
+    remote_strs = [d.as_posix() for d in remote_dirs]
+
+    try:
+        status = _exec(sftp, "mkdir -p -- " + 
+                       " ".join(shlex.quote(d) for d in remote_strs))
+        if status != 0:
+            log.warning(f"Remote mkdir exited with status {status}, falling back to sFTP")
+        elif all(_is_dir(sftp, d) for d in remote_strs):
+            for remote_dir in remote_dirs:
+                _invalidate_parents(remote_dir)
+            log.info(f"Folder(s) created successfully: {', '.join(remote_strs)}")
+            return
+        else:
+            log.warning("Remote mkdir didn't create the folders, falling back to sFTP")
+    except pm.SSHException as e:
+        log.warning(f"Remote exec unavailable ({e}), falling back to sFTP")
+
+    for remote_dir in remote_dirs:
+        # Missing parents first, like `mkdir -p`
+        for folder in [*reversed(remote_dir.parents), remote_dir]:
+            folder_str = folder.as_posix()
+            if folder_str in (".", "/"):
+                continue
+            try:
+                sftp.mkdir(folder_str)
+            except IOError:
+                # Already there is fine, anything else is a real failure
+                try:
+                    attrs = sftp.stat(folder_str)
+                except IOError:
+                    log.error(f"Couldn't create folder: {folder_str}")
+                    raise
+                if not stat.S_ISDIR(attrs.st_mode):
+                    raise FileExistsError(f"{folder_str} exists and isn't a folder!")
+        _invalidate_parents(remote_dir)
+    log.info(f"Folder(s) created successfully: {', '.join(remote_strs)}")
+
+def _rmtree(sftp: pm.SFTPClient, remote_str: str) -> None:
+    """
+    Removes a remote folder and everything in it over sFTP alone.
+
+    Symlinks inside are unlinked, never followed; remote_str itself 
+    must be a real folder, not a link to one.
+    """
+    if stat.S_ISLNK(sftp.lstat(remote_str).st_mode):
+        raise ValueError(f"Refusing to walk symlink {remote_str!r}")
+    base = remote_str.rstrip("/") + "/"
+    for attrs in sftp.listdir_attr(remote_str):
+        full = base + attrs.filename
+        if stat.S_ISDIR(attrs.st_mode):
+            _rmtree(sftp, full)
+        else:
+            sftp.remove(full)
+    sftp.rmdir(remote_str)
+
+def delete(sftp: pm.SFTPClient,
+                remote_dir: Union[posix_path, List[posix_path]], 
+                deletion_type: str,
+                recursive: bool = False) -> None:
     """
     Function to delete files from an sFTP. 
-    
+
+    Takes one path or a list of them. With recursive=True a folder is 
+    removed with everything inside it by a single server-side `rm -rf`, 
+    walking it over sFTP only if the server refuses exec.
     """
     
-    # Initiate sFTP session: 
-    
-    remote_str = remote_dir.as_posix()
+    targets = [remote_dir] if isinstance(remote_dir, posix_path) else remote_dir
 
-    with sftp_connection(hostname, port, username, password) as sftp:
-        try:
+    try:
+        for target in targets:
+            remote_str = target.as_posix()
             if deletion_type == "file":
                 try:
                     attrs = sftp.stat(remote_str)
                 except IOError:
-                    if deletion_type == "file":
-                        log.error(f"Remote file not found: {remote_str}")
-                        raise FileNotFoundError(f"{remote_str} not found!")
+                    log.error(f"Remote file not found: {remote_str}")
+                    raise FileNotFoundError(f"{remote_str} not found!")
                 if stat.S_ISDIR(attrs.st_mode):
                     log.error(f"Remote path is a directory: {remote_str}")
                     raise IsADirectoryError(f"{remote_str} is a directory!")
                 sftp.remove(remote_str)
+                _invalidate(target.parent)
                 log.info(f"File '{remote_str}' deleted successfully.")
             
             elif deletion_type == "folder":
-                sftp.rmdir(remote_str)
+                if recursive:
+                    # Refuse '/', '.' and '..', which don't name a single folder
+                    if target.name in ("", ".", ".."):
+                        raise ValueError(f"Refusing to recursively delete {remote_str!r}")
+                    # rm -rf would quietly take a file or a typo too; lstat 
+                    # so a link to a folder isn't mistaken for the folder
+                    try:
+                        attrs = sftp.lstat(remote_str)
+                    except IOError:
+                        log.error(f"Remote folder not found: {remote_str}")
+                        raise FileNotFoundError(f"{remote_str} not found!")
+                    if stat.S_ISLNK(attrs.st_mode):
+                        # Same as `rm -rf -- link`: drop the link, keep its target
+                        sftp.remove(remote_str)
+                        _invalidate(target.parent)
+                        log.info(f"Symlink '{remote_str}' removed; its target was left alone.")
+                        continue
+                    if not stat.S_ISDIR(attrs.st_mode):
+                        log.error(f"Remote path is not a directory: {remote_str}")
+                        raise NotADirectoryError(f"{remote_str} is not a directory!")
+                    removed = False
+                    try:
+                        status = _exec(sftp, f"rm -rf -- {shlex.quote(remote_str)}")
+                        if status != 0:
+                            log.warning(f"Remote rm exited with status {status}, falling back to sFTP")
+                        elif _is_dir(sftp, remote_str):
+                            log.warning("Remote rm didn't remove the folder, falling back to sFTP")
+                        else:
+                            removed = True
+                    except pm.SSHException as e:
+                        log.warning(f"Remote exec unavailable ({e}), falling back to sFTP")
+                    if not removed:
+                        _rmtree(sftp, remote_str)
+                    _invalidate_tree(target)
+                else:
+                    sftp.rmdir(remote_str)
+                    _invalidate(target)
+                _invalidate(target.parent)
                 log.info(f"Folder '{remote_str}' deleted successfully.")
-        except(
-            pm.SSHException, 
-                pm.AuthenticationException, 
-                ) as e:
-            log.error(f"sFTP error: {e}")
-            raise
+    except(
+        pm.SSHException, 
+            pm.AuthenticationException, 
+            ) as e:
+        log.error(f"sFTP error: {e}")
+        raise
 
 def view_contents(
-                remote_dir: posix_path, 
-                hostname: str,
-                port: int, 
-                username: str,
-                password: str 
-                ) -> List[Tuple[str, str]]:
+                sftp: pm.SFTPClient,
+                remote_dir: posix_path,
+                head: Optional[int] = None,
+                sort: bool = True
+                ) -> Iterator[Tuple[str, str]]:
     """
-    Returns a list of (filename, human_readable_mtime) in the remote_dir.
+    Yields (filename, human_readable_mtime) for each entry in remote_dir.
+
+    head limits the output to the first N names, picked with a heap 
+    rather than a full sort; sort=False yields entries in server order.
+    The rows are produced lazily, so sftp must stay open until the 
+    iterator has been fully consumed.
     """
     
     remote_str = remote_dir.as_posix()
-    out = []
+    # ctime beats strftime(localtime()) per call; only skip the attribute lookup
+    ctime = time.ctime
+
+    # listdir_attr returns every entry's attributes in one round trip
+    if head is not None:
+        entries = heapq.nsmallest(head, _ls(sftp, remote_str, sort=False), 
+                                  key=_by_name)
+    else:
+        entries = _ls(sftp, remote_str, sort=sort)
     
-    with sftp_connection(hostname, port, username, password) as sftp:
-        for name in sorted(sftp.listdir(remote_str)):
-            full_path = f"{remote_str}/{name}"
-            attrs = sftp.stat(full_path)
-            mtime = time.ctime(attrs.st_mtime)
-            out.append((name, mtime))
-    return out
+    for attrs in entries:
+        yield (attrs.filename, ctime(attrs.st_mtime))
 
 def output_csv(
-    rows: List[Tuple[str, str]],
+    rows: Iterable[Tuple[str, str]],
     output_path: path
 ) -> None:
     """
     Writes the contents of 'list' mode within view as a .csv file.
+
+    Rows are streamed straight to disk, so any iterable (such as 
+    view_contents()) can be passed without building a list first.
     """
     # Ensure parent folders exist
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with output_path.open("w", newline="", encoding="utf-8") as f:
+    count = 0
+    def _counted() -> Iterator[Tuple[str, str]]:
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+
+    # A 1 MiB binary buffer under the text layer keeps write(2) calls rare
+    raw = output_path.open("wb", buffering=CSV_BUFFER_SIZE)
+    with io.TextIOWrapper(raw, encoding="utf-8", newline="",
+                          write_through=False) as f:
         writer = csv.writer(f)
         # header
         writer.writerow(["File", "Last Modified"])
         # data rows
-        writer.writerows(rows)
+        writer.writerows(_counted())
 
-    log.info(f"Wrote {len(rows)} entries to {output_path}")
+    log.info(f"Wrote {count} entries to {output_path}")
             
 def stfp_formatter(
-    hostname: str,
-    port:     int,
-    username: str,
-    password: str,
-    remote_dir: Union[str, posix_path]
+    sftp: pm.SFTPClient,
+    remote_dir: Union[str, posix_path],
+    workers: int = TREE_WORKERS
                 ) -> None:
     """
-    Connect to the SFTP server and print a GitHub‐style tree of remote_dir.
+    Print a GitHub‐style tree of remote_dir over an open sFTP session.
+
+    Listings are fetched breadth-first before anything is printed, with 
+    up to `workers` directories listed at once. Paramiko can't serve one 
+    SFTPClient from several threads, so extra sFTP channels are opened on 
+    the session's own transport (no new logins), and only when more than 
+    one uncached directory is in flight.
 
     Used only with the view_contents() function exclusively.
     """
-    # Convert to a forward‐slash string
-    root = str(remote_dir).rstrip("/")
+    # Same spelling as the listing cache uses
+    root = _cache_key(remote_dir)
+
+    # Fetch pass: list every directory in the tree
+    transport = sftp.get_channel().get_transport()
+    idle: "queue.Queue[pm.SFTPClient]" = queue.Queue()
+    idle.put(sftp)
+    opened: List[pm.SFTPClient] = []
+    # Channels are opened one at a time; once the server refuses one 
+    # (e.g. MaxSessions 1) the rest of the walk shares the open clients
+    open_lock = threading.Lock()
+    no_more_channels = threading.Event()
 
-    # Establish transport & client
-    with sftp_connection(hostname, port, username, password) as sftp:
+    def _client() -> pm.SFTPClient:
         try:
-            print(root + "/")
-            # inner recursive helper
-            def _walk(path: str, prefix: str = ""):
-                entries = sorted(sftp.listdir(path))
-                for idx, name in enumerate(entries):
-                    full  = f"{path.rstrip('/')}/{name}"
-                    is_dir = stat.S_ISDIR(sftp.stat(full).st_mode)
-                    branch = "└── " if idx == len(entries)-1 else "├── "
-                    suffix  = "/" if is_dir else ""
-                    print(f"{prefix}{branch}{name}{suffix}")
-                    if is_dir:
-                        extension = "    " if idx == len(entries) - 1 else "│   "
-                        _walk(full, prefix + extension)
-            _walk(root)
+            return idle.get_nowait()
+        except queue.Empty:
+            pass
+        with open_lock:
+            if not no_more_channels.is_set():
+                try:
+                    client = pm.SFTPClient.from_transport(transport)
+                    opened.append(client)
+                    return client
+                except pm.SSHException as e:
+                    no_more_channels.set()
+                    log.info(f"Server refused another sFTP channel ({e}); "
+                             "listing on the open ones")
+        # Wait for a client already in use, the main one at least
+        return idle.get()
+
+    def _fetch(path: str) -> List[pm.SFTPAttributes]:
+        client = _client()
+        try:
+            return _ls(client, path)
         finally:
-            if sftp:
-                sftp.close()
+            idle.put(client)
+
+    listings: Dict[str, List[pm.SFTPAttributes]] = {}
+    pending = deque([root])
+    in_flight: Dict[Future, str] = {}
+
+    def _add(path: str, entries: List[pm.SFTPAttributes]) -> None:
+        listings[path] = entries
+        base = _child_prefix(path)
+        for attrs in entries:
+            if stat.S_ISDIR(attrs.st_mode):
+                pending.append(base + attrs.filename)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while pending or in_flight:
+                while pending and len(in_flight) < workers:
+                    path = pending.popleft()
+                    if path in _dir_cache:
+                        # Already listed this session, no round trip needed
+                        _add(path, _ls(sftp, path))
+                    else:
+                        in_flight[executor.submit(_fetch, path)] = path
+                if not in_flight:
+                    continue
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _add(in_flight.pop(future), future.result())
+    finally:
+        for client in opened:
+            client.close()
+
+    # Print pass: no network access from here on
+    print(root.rstrip("/") + "/")
+    branch_mid, branch_end = "├── ", "└── "
+    ext_mid, ext_end = "│   ", "    "
+    is_dir_mode = stat.S_ISDIR
+    def _walk(path: str, prefix: str = ""):
+        entries = listings[path]
+        base = _child_prefix(path)
+        last = len(entries) - 1
+        for idx, attrs in enumerate(entries):
+            name = attrs.filename
+            is_dir = is_dir_mode(attrs.st_mode)
+            is_last = idx == last
+            branch = branch_end if is_last else branch_mid
+            suffix  = "/" if is_dir else ""
+            print(f"{prefix}{branch}{name}{suffix}")
+            if is_dir:
+                _walk(base + name, prefix + (ext_end if is_last else ext_mid))
+    _walk(root)
 
     
 def main():
@@ -257,101 +856,129 @@ def main():
 ******************************************************************************************
 """)
 
-    host = ask("Host: ").strip()
-    username = ask("Username: ")
-    password = ask("Password: ").strip()
+    setup_history()
+    host, username, password, pkey_path = ask_credentials()
     port = 22
     
-    # Input for selecting to view or upload files
+    # One sFTP session is reused for every action until the credentials change
     while True:
-        choice = ask(
-            "Type 'upload' to send a file, " \
-            "'folder' to make a new folder, " \
-            "'delete' to remove either or 'view' "  
-            " to list all files within the server: ").strip().lower()       
-        
-        if choice == "upload":
-            src = path(ask("Local file to upload: "))
-            dst_dir = posix_path(ask("Remote directory: ").strip())
+        with ExitStack() as session:
             try:
-                upload_file(src, dst_dir, host, port, username, password)
+                sftp = session.enter_context(
+                    sftp_connection(host, port, username, password, pkey_path))
             except Exception as e:
-                log.error(f"Upload failed: {e}")
+                log.error(f"Connection failed: {e}")
                 sys.exit(1)
+            # Input for selecting to view or upload files
+            while True:
+                choice = _norm(ask(
+                    "Type 'upload' to send a file, " \
+                    "'folder' to make a new folder, " \
+                    "'delete' to remove either or 'view' "  
+                    " to list all files within the server: "))
+        
+                if choice == "upload":
+                    src = path(ask("Local file or folder to upload: ")).expanduser()
+                    dst_dir = posix_path(ask("Remote directory: ").strip())
+                    try:
+                        files = (sorted(p for p in src.iterdir() if p.is_file())
+                                 if src.is_dir() else [src])
+                        if not files:
+                            log.info(f"No files found in {src}")
+                        elif SFTP_BACKEND == "asyncssh":
+                            upload_files_asyncssh(files, dst_dir, host, port, username,
+                                                  password, pkey_path)
+                        elif src.is_dir():
+                            upload_files(files, dst_dir, host, port, username, password,
+                                         pkey_path=pkey_path)
+                        else:
+                            upload_file(sftp, src, dst_dir)
+                    except Exception as e:
+                        log.error(f"Upload failed: {e}")
+                        sys.exit(1)
 
-        elif choice == "folder":
-            new_dir = posix_path(ask("New remote directory: ").strip())
-            try:
-                create_dir(new_dir, host, port, username, password)
-            except Exception as e:
-                log.error(f"Folder creation failed: {e}")
-                sys.exit(1)
+                elif choice == "folder":
+                    new_dirs = ask_paths("New remote directory: ")
+                    try:
+                        # mkdir -p semantics whether one folder or many
+                        create_dirs(sftp, new_dirs)
+                    except Exception as e:
+                        log.error(f"Folder creation failed: {e}")
+                        sys.exit(1)
         
-        elif choice == "delete":
-            deletion_type = input("File or Folder? ")
-            dst_dir = posix_path(ask("Remote directory: ").strip())
-            try: 
-                delete(dst_dir, host, port, username, password, deletion_type)
-            except Exception as e:
-                log.error(f"Deletion failed: {e}")
-                sys.exit(1)
+                elif choice == "delete":
+                    deletion_type = _norm(ask("File or Folder? "))
+                    targets = ask_paths("Remote directory: ")
+                    recursive = False
+                    if deletion_type == "folder":
+                        recursive = _norm(ask(
+                            "Delete everything inside too? (yes/no): ")) == "yes"
+                    try: 
+                        delete(sftp, targets, deletion_type, recursive)
+                    except Exception as e:
+                        log.error(f"Deletion failed: {e}")
+                        sys.exit(1)
 
-        elif choice == "view":
-            remote_dir = posix_path(ask("Remote directory to list: ").strip())
-            view_mode = ask(
-                "Type 'list' for flat listing, 'csv' for the lists' contents as a .csv, or 'tree' for full directory tree: ") \
-                            .strip().lower()
-            if view_mode == "list":
-                try:
-                    files = view_contents(remote_dir, host, port, username, password)
-                    max_name = max(len(name) for name, _ in files + [("File", "")])
-                    header = f"{'File'.ljust(max_name)}   Last Modified"
-                    sep    = "-" * len(header)
-                    print(header)
-                    print(sep)
-                    for name, mtime in files:
-                        print(f"{name.ljust(max_name)}   {mtime}")
-                except Exception as e:
-                    log.error(f"Failed to list directory: {e}")
-                    sys.exit(1)
-            elif view_mode == "tree":
-                try:
-                    stfp_formatter(host, port, username, password, remote_dir)
-                except Exception as e:
-                    log.error(f"Failed to print tree: {e}")
-                    sys.exit(1)
-            elif view_mode == "csv":
-                files = view_contents(remote_dir, host, port, username, password) 
-                out_file = path(ask("Output csv file path: "))
-                try:
-                    output_csv(files, out_file)
-                except Exception as e:
-                    log.error(f"Failed to write csv: {e}")
+                elif choice == "view":
+                    remote_dir = posix_path(ask("Remote directory to list: ").strip())
+                    view_mode = _norm(ask(
+                        "Type 'list' for flat listing, 'csv' for the lists' contents as a .csv, or 'tree' for full directory tree: "))
+                    if view_mode == "list":
+                        head = ask("Number of entries to show (blank for all): ")
+                        try:
+                            head = int(head) if head else None
+                            header = f"{'File'.ljust(LIST_NAME_WIDTH)}   Last Modified"
+                            sep    = "-" * len(header)
+                            print(header)
+                            print(sep)
+                            for name, mtime in view_contents(sftp, remote_dir, head):
+                                # Cut overlong names so the mtime column stays aligned
+                                if len(name) > LIST_NAME_WIDTH:
+                                    name = name[:LIST_NAME_WIDTH - 1] + "…"
+                                print(f"{name.ljust(LIST_NAME_WIDTH)}   {mtime}")
+                        except Exception as e:
+                            log.error(f"Failed to list directory: {e}")
+                            sys.exit(1)
+                    elif view_mode == "tree":
+                        try:
+                            stfp_formatter(sftp, remote_dir)
+                        except Exception as e:
+                            log.error(f"Failed to print tree: {e}")
+                            sys.exit(1)
+                    elif view_mode == "csv":
+                        # CSV consumers can sort for themselves
+                        files = view_contents(sftp, remote_dir, sort=False)
+                        out_file = path(ask("Output csv file path: "))
+                        try:
+                            output_csv(files, out_file)
+                        except Exception as e:
+                            log.error(f"Failed to write csv: {e}")
+                            sys.exit(1)
+                    else:
+                        log.error("Invalid view mode—please enter 'list', 'tree', or 'csv'.")
+                        sys.exit(1)
+                else:
+                    log.error(f"Invalid choice {choice!r}; please enter 'upload', 'delete', 'folder' or 'view'.")
                     sys.exit(1)
-            else:
-                log.error("Invalid view mode—please enter 'list', 'tree', or 'csv'.")
-                sys.exit(1)
-        else:
-            log.error(f"Invalid choice {choice!r}; please enter 'upload', 'delete', 'folder' or 'view'.")
-            sys.exit(1)
         
-        # Restart loop logic
-        restart = ask("Continue? (yes/no): ").strip().lower()
-        if restart == "no":
-            log.info("Goodbye!")
-            break
-        same_creds = ask("Proceed with the same sFTP credentials? (yes/no): ").strip().lower()
-        if same_creds == "yes":
-            continue
-        elif same_creds == "no":
-            log.info("Please reenter sFTP credentials:")
-            host = ask("Host: ").strip()
-            username = ask("Username: ")
-            password = ask("Password: ").strip()
-            continue
-        else:   
-            log.error("Invalid answer-please enter 'yes', or 'no'.")
-            continue
+                # Restart loop logic
+                restart = _norm(ask("Continue? (yes/no): "))
+                if restart == "no":
+                    log.info("Goodbye!")
+                    return
+                same_creds = _norm(ask("Proceed with the same sFTP credentials? (yes/no): "))
+                if same_creds == "yes":
+                    continue
+                elif same_creds == "no":
+                    log.info("Please reenter sFTP credentials:")
+                    host, username, password, pkey_path = ask_credentials()
+                    # Cached listings belong to the old server
+                    _dir_cache.clear()
+                    # Leave the session so it reconnects with the new creds
+                    break
+                else:   
+                    log.error("Invalid answer-please enter 'yes', or 'no'.")
+                    continue
 
 if __name__ == "__main__":
     main()